@@ -1,25 +1,86 @@
-from flask import Flask, request, jsonify
+import atexit
+import os
+import threading
+import time
+
+from flask import Blueprint, Flask, request, jsonify
 from flask_cors import CORS
 from models import init_db, User, Message
-from scheduler import start_scheduler, process_emails
-from config import FLASK_HOST, FLASK_PORT, FLASK_DEBUG, EMAIL_ADDRESS
-import atexit
+from config import FLASK_HOST, FLASK_PORT, FLASK_DEBUG, EMAIL_ADDRESS, SCHEDULER_AUTOSTART
+
+# Routes live on a blueprint so create_app() can build the app without side effects
+api = Blueprint('api', __name__)
+
+# Database and scheduler are set up on first use, not at import time
+_init_lock = threading.Lock()
+_db_initialized = False
+_scheduler = None
+# Pid of the process that started the scheduler; forked children see it but don't own it
+_scheduler_pid = None
+_scheduler_warning_shown = False
+
+
+def ensure_db():
+    """Initialize the database once per process."""
+    global _db_initialized
+    if _db_initialized:
+        return
+    with _init_lock:
+        if not _db_initialized:
+            init_db()
+            _db_initialized = True
+
 
-# Initialize Flask app
-app = Flask(__name__)
-CORS(app)  # Enable CORS for frontend
+def ensure_scheduler():
+    """Start the email scheduler once per process and return it."""
+    global _scheduler, _scheduler_pid
+    if _scheduler is not None:
+        return _scheduler
+    with _init_lock:
+        if _scheduler is None:
+            # Imported lazily: APScheduler is only needed once the scheduler runs
+            from scheduler import start_scheduler
 
-# Initialize database
-init_db()
+            _scheduler = start_scheduler()
+            _scheduler_pid = os.getpid()
 
-# Start email scheduler
-scheduler = start_scheduler()
+            # Shut down the scheduler when exiting the app
+            atexit.register(_shutdown_scheduler)
+    return _scheduler
 
-# Shut down the scheduler when exiting the app
-atexit.register(lambda: scheduler.shutdown())
 
+def _shutdown_scheduler():
+    """Shut down the scheduler, but only in the process that started it."""
+    if _scheduler is not None and os.getpid() == _scheduler_pid:
+        _scheduler.shutdown()
 
-@app.route('/')
+
+def reset_after_fork():
+    """Drop the scheduler and lock copied from the parent into a forked worker."""
+    global _init_lock, _scheduler
+    # The copied lock may have been held by a parent thread at fork time
+    _init_lock = threading.Lock()
+    _scheduler = None
+
+
+@api.before_app_request
+def lazy_init():
+    """Initialize the database on the first API request."""
+    global _scheduler_warning_shown
+    # No process started a scheduler (e.g. `flask run` or waitress), so mail won't be polled
+    if SCHEDULER_AUTOSTART and _scheduler_pid is None and not _scheduler_warning_shown:
+        _scheduler_warning_shown = True
+        print("Warning: email scheduler is not running; serve with gunicorn "
+              "(gunicorn.conf.py), `python app.py`, or run `flask --app app run-scheduler`")
+
+    # Keep the health check free of any DB work. The scheduler is never
+    # started from a request: see gunicorn.conf.py and `run-scheduler`.
+    if request.endpoint == 'api.index':
+        return
+    ensure_db()
+
+
+@api.route('/')
 def index():
     """Health check endpoint."""
     return jsonify({
@@ -28,7 +89,7 @@ def index():
     })
 
 
-@app.route('/api/register', methods=['POST'])
+@api.route('/api/register', methods=['POST'])
 def register():
     """Register a new user."""
     data = request.get_json()
@@ -71,7 +132,7 @@ def register():
         }), 500
 
 
-@app.route('/api/user/<email>', methods=['GET'])
+@api.route('/api/user/<email>', methods=['GET'])
 def get_user(email):
     """Get user information."""
     user = User.get(email.lower().strip())
@@ -88,7 +149,7 @@ def get_user(email):
         }), 404
 
 
-@app.route('/api/history/<email>', methods=['GET'])
+@api.route('/api/history/<email>', methods=['GET'])
 def get_history(email):
     """Get conversation history for a user."""
     # Check if user exists
@@ -98,8 +159,9 @@ def get_history(email):
             'error': 'User not found'
         }), 404
 
-    # Get message history
-    messages = Message.get_history(email.lower().strip())
+    # Get message history (?include_archived=true also reads the archive database)
+    include_archived = request.args.get('include_archived', 'false').lower() == 'true'
+    messages = Message.get_history(email.lower().strip(), include_archived=include_archived)
 
     return jsonify({
         'success': True,
@@ -107,9 +169,11 @@ def get_history(email):
     })
 
 
-@app.route('/api/check-emails', methods=['POST'])
+@api.route('/api/check-emails', methods=['POST'])
 def manual_email_check():
     """Manually trigger email check (for testing)."""
+    from scheduler import process_emails
+
     try:
         process_emails()
         return jsonify({
@@ -123,10 +187,72 @@ def manual_email_check():
         }), 500
 
 
+def register_commands(app):
+    """Register CLI commands (run with `flask --app app <command>`)."""
+
+    @app.cli.command('init-db')
+    def init_db_command():
+        """Create the database tables."""
+        ensure_db()
+
+    @app.cli.command('check-emails')
+    def check_emails_command():
+        """Run a single email check and exit."""
+        from scheduler import process_emails
+
+        ensure_db()
+        process_emails()
+
+    @app.cli.command('vacuum')
+    def vacuum_command():
+        """Enable incremental vacuum on an existing database (one-time full VACUUM)."""
+        from models import enable_incremental_vacuum
+
+        ensure_db()
+        enable_incremental_vacuum()
+        print("Incremental vacuum enabled")
+
+    @app.cli.command('archive-messages')
+    def archive_messages_command():
+        """Apply the retention policy once and exit."""
+        from scheduler import archive_messages
+
+        ensure_db()
+        archive_messages()
+
+    @app.cli.command('run-scheduler')
+    def run_scheduler_command():
+        """Run the email scheduler in the foreground."""
+        ensure_db()
+        ensure_scheduler()
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            pass  # The atexit hook shuts the scheduler down
+
+
+def create_app():
+    """Create the Flask app without touching the database or scheduler."""
+    app = Flask(__name__)
+    CORS(app)  # Enable CORS for frontend
+    app.register_blueprint(api)
+    register_commands(app)
+    return app
+
+
+# Module-level app for `gunicorn app:app`
+app = create_app()
+
+
 if __name__ == '__main__':
     print("Emotional Support Bot - Backend Server")
     print(f"Server running on http://{FLASK_HOST}:{FLASK_PORT}")
     print(f"Bot email: {EMAIL_ADDRESS}")
 
-    app.run(host=FLASK_HOST, port=FLASK_PORT, debug=FLASK_DEBUG)
+    # Running the server directly is an explicit start, so initialize eagerly
+    ensure_db()
+    if SCHEDULER_AUTOSTART:
+        ensure_scheduler()
 
+    app.run(host=FLASK_HOST, port=FLASK_PORT, debug=FLASK_DEBUG)
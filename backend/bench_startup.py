@@ -0,0 +1,61 @@
+"""
+Benchmark cold-start time of the backend.
+
+Each run starts a fresh interpreter, imports app.py and serves `/` once
+through the Flask test client. Run with: python bench_startup.py [runs]
+"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Executed in a child process so every run is a real cold start
+CHILD_SCRIPT = '''
+import json, sys, time
+start = time.perf_counter()
+import app
+imported = time.perf_counter()
+response = app.app.test_client().get('/')
+served = time.perf_counter()
+print(json.dumps({
+    'import_ms': (imported - start) * 1000,
+    'first_request_ms': (served - imported) * 1000,
+    'status': response.status_code,
+    'heavy_modules': [m for m in ('openai', 'apscheduler', 'imaplib') if m in sys.modules],
+}))
+'''
+
+
+def run_once() -> dict:
+    """Run a single cold start and return its timings."""
+    result = subprocess.run(
+        [sys.executable, '-c', CHILD_SCRIPT],
+        cwd=BASE_DIR,
+        capture_output=True,
+        text=True
+    )
+    if result.returncode != 0:
+        sys.exit(f"Cold start failed:\n{result.stderr}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    results = [run_once() for _ in range(runs)]
+
+    import_ms = statistics.median(r['import_ms'] for r in results)
+    request_ms = statistics.median(r['first_request_ms'] for r in results)
+
+    print(f"Cold starts: {runs}")
+    print(f"Import app.py (median): {import_ms:.1f} ms")
+    print(f"First GET / (median): {request_ms:.1f} ms")
+    print(f"Total (median): {import_ms + request_ms:.1f} ms")
+    print(f"Status codes: {sorted(set(r['status'] for r in results))}")
+    print(f"Heavy modules loaded: {results[-1]['heavy_modules'] or 'none'}")
+
+
+if __name__ == '__main__':
+    main()
@@ -16,6 +16,21 @@ OPENAI_API_KEY = os.getenv('OPENAI_API_KEY', '')
 # Scheduler Configuration
 # Set to minutes (60 = 1 hour)
 EMAIL_CHECK_INTERVAL_MINUTES = int(os.getenv('EMAIL_CHECK_INTERVAL_MINUTES', '60'))  # Default: 1 hour
+# Start the scheduler with the server (gunicorn.conf.py or `python app.py`); set False when
+# it runs as a separate `flask --app app run-scheduler` process
+SCHEDULER_AUTOSTART = os.getenv('SCHEDULER_AUTOSTART', 'True') == 'True'
+# Delay the initial email check so it doesn't compete with server boot
+STARTUP_EMAIL_CHECK_DELAY_SECONDS = int(os.getenv('STARTUP_EMAIL_CHECK_DELAY_SECONDS', '30'))
+
+# Data Retention Configuration
+# Retention is off by default; set either value to start archiving
+# Messages older than this many days are moved to the archive database (0 = keep forever)
+RETENTION_DAYS = int(os.getenv('RETENTION_DAYS', '0'))
+# Only the newest N messages per user stay in the live table (0 = no limit)
+RETENTION_KEEP_PER_USER = int(os.getenv('RETENTION_KEEP_PER_USER', '0'))
+# Messages moved per transaction, kept small so the email job isn't blocked
+RETENTION_BATCH_SIZE = int(os.getenv('RETENTION_BATCH_SIZE', '500'))
+RETENTION_INTERVAL_HOURS = int(os.getenv('RETENTION_INTERVAL_HOURS', '24'))  # Default: daily
 
 # Flask Configuration
 FLASK_HOST = '0.0.0.0'
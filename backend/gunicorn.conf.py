@@ -0,0 +1,26 @@
+"""
+Gunicorn settings, loaded automatically by `gunicorn app:app` from this directory.
+
+The email scheduler is started once in the master process when the server
+is ready, so mail is polled even if no API request ever arrives. Workers
+only serve HTTP: post_fork drops the scheduler state they inherit, and
+only the master shuts the scheduler down on exit. Set SCHEDULER_AUTOSTART=False when the scheduler runs as
+a separate `flask --app app run-scheduler` process instead.
+"""
+
+
+def when_ready(server):
+    """Initialize the database and start the scheduler in the master process."""
+    from config import SCHEDULER_AUTOSTART
+    from app import ensure_db, ensure_scheduler
+
+    ensure_db()
+    if SCHEDULER_AUTOSTART:
+        ensure_scheduler()
+
+
+def post_fork(server, worker):
+    """Reset scheduler state copied from the master into the new worker."""
+    from app import reset_after_fork
+
+    reset_after_fork()
@@ -1,18 +1,24 @@
 import sqlite3
 import json
 import os
-from datetime import datetime
+from datetime import datetime, timedelta
 from typing import List, Dict, Optional
 
 # Get the directory where this file is located
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 DATABASE_PATH = os.path.join(BASE_DIR, 'database.db')
+# Old messages are moved here by the retention job
+ARCHIVE_DATABASE_PATH = os.path.join(BASE_DIR, 'archive.db')
 
 def init_db():
     """Initialize the database with required tables."""
     conn = sqlite3.connect(DATABASE_PATH)
     cursor = conn.cursor()
 
+    # New databases let the retention job give freed pages back with
+    # PRAGMA incremental_vacuum; existing ones need enable_incremental_vacuum()
+    cursor.execute('PRAGMA auto_vacuum = INCREMENTAL')
+
     # Create Users table
     cursor.execute('''
         CREATE TABLE IF NOT EXISTS users (
@@ -35,11 +41,53 @@ def init_db():
         )
     ''')
 
+    # Index for per-user history lookups and retention scans
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_messages_user_timestamp
+        ON messages (user_email, timestamp)
+    ''')
+
     conn.commit()
+
+    # Converting an existing database needs a full VACUUM, which is too slow
+    # to run here, so only warn
+    cursor.execute('PRAGMA auto_vacuum')
+    if cursor.fetchone()[0] != 2:
+        print("Warning: incremental vacuum is not enabled; "
+              "run `flask --app app vacuum` once to enable it")
+
     conn.close()
     print("Database initialized successfully!")
 
 
+def enable_incremental_vacuum():
+    """Switch an existing database to incremental auto-vacuum (rewrites the whole file)."""
+    conn = sqlite3.connect(DATABASE_PATH, isolation_level=None)
+    conn.execute('PRAGMA auto_vacuum = INCREMENTAL')
+    conn.execute('VACUUM')
+    conn.close()
+
+
+def attach_archive(conn: sqlite3.Connection):
+    """Attach the archive database as `archive`, creating its table if needed."""
+    conn.execute('ATTACH DATABASE ? AS archive', (ARCHIVE_DATABASE_PATH,))
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS archive.messages (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            message_id INTEGER NOT NULL,
+            user_email TEXT NOT NULL,
+            role TEXT NOT NULL,
+            content TEXT NOT NULL,
+            timestamp DATETIME,
+            archived_at DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    conn.execute('''
+        CREATE INDEX IF NOT EXISTS archive.idx_archive_user_timestamp
+        ON messages (user_email, timestamp)
+    ''')
+
+
 class User:
     @staticmethod
     def create(email: str, name: str, occupation: str, interests: str, 
@@ -127,18 +175,40 @@ class Message:
             return False
 
     @staticmethod
-    def get_history(user_email: str, limit: int = 50) -> List[Dict]:
-        """Get conversation history for a user."""
+    def get_history(user_email: str, limit: int = 50,
+                    include_archived: bool = False) -> List[Dict]:
+        """Get conversation history for a user, optionally including archived messages."""
         conn = sqlite3.connect(DATABASE_PATH)
         cursor = conn.cursor()
 
-        cursor.execute('''
-            SELECT role, content, timestamp 
-            FROM messages 
-            WHERE user_email = ?
-            ORDER BY timestamp ASC
-            LIMIT ?
-        ''', (user_email, limit))
+        if include_archived and os.path.exists(ARCHIVE_DATABASE_PATH):
+            attach_archive(conn)
+            # Take the newest `limit` rows so archived messages never crowd out
+            # the live conversation, then return them oldest first
+            cursor.execute('''
+                SELECT role, content, timestamp FROM (
+                    SELECT role, content, timestamp FROM (
+                        SELECT role, content, timestamp
+                        FROM archive.messages
+                        WHERE user_email = ?
+                        UNION ALL
+                        SELECT role, content, timestamp
+                        FROM main.messages
+                        WHERE user_email = ?
+                    )
+                    ORDER BY timestamp DESC
+                    LIMIT ?
+                )
+                ORDER BY timestamp ASC
+            ''', (user_email, user_email, limit))
+        else:
+            cursor.execute('''
+                SELECT role, content, timestamp 
+                FROM messages 
+                WHERE user_email = ?
+                ORDER BY timestamp ASC
+                LIMIT ?
+            ''', (user_email, limit))
 
         messages = []
         for row in cursor.fetchall():
@@ -175,3 +245,118 @@ class Message:
         conn.close()
         return list(reversed(messages))  # Return in chronological order
 
+
+    @staticmethod
+    def archive_old(older_than_days: int = 0, keep_per_user: int = 0,
+                    batch_size: int = 500) -> int:
+        """
+        Move old messages from the live table into the archive database.
+
+        Args:
+            older_than_days: Archive messages older than this many days (0 = ignore age)
+            keep_per_user: Archive everything beyond the newest N messages per user (0 = no limit)
+            batch_size: Messages moved per transaction
+
+        Returns:
+            Number of messages archived
+
+        Raises:
+            sqlite3.Error: If a batch fails; that batch is rolled back and the
+                error is re-raised so the scheduler reports the failure
+        """
+        if older_than_days <= 0 and keep_per_user <= 0:
+            return 0
+        cutoff = datetime.now() - timedelta(days=older_than_days) if older_than_days > 0 else None
+
+        # Autocommit mode so each batch is its own short, explicit transaction
+        conn = sqlite3.connect(DATABASE_PATH, isolation_level=None)
+        cursor = conn.cursor()
+
+        archived = 0
+        try:
+            attach_archive(conn)
+            # Batch ids go through a temp table, so batch_size isn't bound by
+            # SQLite's limit on query parameters
+            cursor.execute('CREATE TEMP TABLE archive_batch (id INTEGER PRIMARY KEY)')
+
+            cursor.execute('SELECT DISTINCT user_email FROM main.messages')
+            user_emails = [row[0] for row in cursor.fetchall()]
+
+            for user_email in user_emails:
+                # Ids are picked outside the write lock; new messages are always
+                # newer, so the selection stays valid while batches are moved
+                ids = Message._ids_to_archive(cursor, user_email, cutoff, keep_per_user)
+
+                for start in range(0, len(ids), batch_size):
+                    batch = ids[start:start + batch_size]
+
+                    # Fill the temp table before taking the write lock on main
+                    cursor.execute('DELETE FROM temp.archive_batch')
+                    cursor.executemany('INSERT INTO temp.archive_batch (id) VALUES (?)',
+                                       [(message_id,) for message_id in batch])
+
+                    cursor.execute('BEGIN IMMEDIATE')
+                    cursor.execute('''
+                        INSERT INTO archive.messages (message_id, user_email, role, content, timestamp)
+                        SELECT id, user_email, role, content, timestamp
+                        FROM main.messages
+                        WHERE id IN (SELECT id FROM temp.archive_batch)
+                    ''')
+                    cursor.execute('''
+                        DELETE FROM main.messages
+                        WHERE id IN (SELECT id FROM temp.archive_batch)
+                    ''')
+                    cursor.execute('COMMIT')
+
+                    archived += len(batch)
+
+            if archived:
+                # Return the freed pages to the filesystem without a full VACUUM.
+                # executescript steps the pragma to completion; execute() would
+                # free only a single page.
+                conn.executescript('PRAGMA main.incremental_vacuum;')
+        except sqlite3.Error as e:
+            if conn.in_transaction:
+                cursor.execute('ROLLBACK')
+            print(f"Error archiving messages after {archived} archived: {e}")
+            raise
+        finally:
+            conn.close()
+
+        return archived
+
+    @staticmethod
+    def _ids_to_archive(cursor: sqlite3.Cursor, user_email: str,
+                        cutoff: Optional[datetime], keep_per_user: int) -> List[int]:
+        """Get ids of a user's messages that fall outside the retention policy."""
+        conditions = []
+        params = [user_email]
+
+        if cutoff is not None:
+            conditions.append('timestamp < ?')
+            params.append(cutoff)
+
+        if keep_per_user > 0:
+            # The newest message that is still kept; everything older is archived
+            cursor.execute('''
+                SELECT timestamp, id
+                FROM main.messages
+                WHERE user_email = ?
+                ORDER BY timestamp DESC, id DESC
+                LIMIT 1 OFFSET ?
+            ''', (user_email, keep_per_user - 1))
+            row = cursor.fetchone()
+            if row:
+                conditions.append('(timestamp < ? OR (timestamp = ? AND id < ?))')
+                params.extend([row[0], row[0], row[1]])
+
+        if not conditions:
+            return []
+
+        cursor.execute(f'''
+            SELECT id
+            FROM main.messages
+            WHERE user_email = ? AND ({' OR '.join(conditions)})
+            ORDER BY id
+        ''', params)
+        return [row[0] for row in cursor.fetchall()]
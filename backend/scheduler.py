@@ -1,12 +1,18 @@
-from apscheduler.schedulers.background import BackgroundScheduler
-from email_service import check_new_emails, send_email
-from ai_service import generate_response
+from datetime import datetime, timedelta
 from models import User, Message
-from config import EMAIL_CHECK_INTERVAL_MINUTES
+from config import (
+    EMAIL_CHECK_INTERVAL_MINUTES, STARTUP_EMAIL_CHECK_DELAY_SECONDS,
+    RETENTION_DAYS, RETENTION_KEEP_PER_USER, RETENTION_BATCH_SIZE,
+    RETENTION_INTERVAL_HOURS
+)
 
 
 def process_emails():
     """Process new emails from registered users and send AI responses."""
+    # Imported here so loading this module doesn't pull in openai/imaplib
+    from email_service import check_new_emails, send_email
+    from ai_service import generate_response
+
     print("\n=== Starting email check ===")
 
     # Get all registered user emails
@@ -66,8 +72,28 @@ def process_emails():
     print("=== Email check completed ===\n")
 
 
+def archive_messages():
+    """Move messages outside the retention policy into the archive database."""
+    print("\n=== Starting message archival ===")
+
+    try:
+        archived = Message.archive_old(
+            older_than_days=RETENTION_DAYS,
+            keep_per_user=RETENTION_KEEP_PER_USER,
+            batch_size=RETENTION_BATCH_SIZE
+        )
+    except Exception:
+        print("=== Message archival failed ===\n")
+        raise  # Let APScheduler log the job as failed
+
+    print(f"Archived {archived} message(s)")
+    print("=== Message archival completed ===\n")
+
+
 def start_scheduler():
     """Start the background scheduler for email checking."""
+    from apscheduler.schedulers.background import BackgroundScheduler
+
     scheduler = BackgroundScheduler()
 
     # Schedule email checking at configured interval
@@ -80,14 +106,28 @@ def start_scheduler():
         replace_existing=True
     )
 
-    # Also run immediately on startup for testing
+    # Also run shortly after startup, once the server has finished booting
     scheduler.add_job(
         func=process_emails,
         trigger='date',
+        run_date=datetime.now() + timedelta(seconds=STARTUP_EMAIL_CHECK_DELAY_SECONDS),
         id='startup_check',
         name='Initial email check'
     )
 
+    # Schedule archival only when a retention policy is configured
+    if RETENTION_DAYS > 0 or RETENTION_KEEP_PER_USER > 0:
+        scheduler.add_job(
+            func=archive_messages,
+            trigger='interval',
+            hours=RETENTION_INTERVAL_HOURS,
+            id='archive_job',
+            name='Archive old messages',
+            replace_existing=True,
+            max_instances=1,
+            coalesce=True
+        )
+
     scheduler.start()
 
     print(f"Scheduler started - checking emails every {EMAIL_CHECK_INTERVAL_MINUTES} minute(s)")